@@ -0,0 +1,50 @@
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from typing import Optional
+import os
+
+def create_db_client():
+    """Create the MongoDB client, or None when MONGO_URL isn't configured"""
+    mongo_url = os.environ.get('MONGO_URL')
+    if not mongo_url:
+        return None
+    return AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', 200)),
+        minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', 20)),
+        compressors="zstd,zlib",
+        serverSelectionTimeoutMS=5000,
+        retryWrites=True,
+        uuidRepresentation="standard"
+    )
+
+def get_db_name():
+    return os.environ.get('DB_NAME', 'notion_task_manager')
+
+async def get_db(request: Request) -> Optional[AsyncIOMotorDatabase]:
+    """Dependency returning the database opened by the app's lifespan"""
+    state = request.app.state
+    if not hasattr(state, "db"):
+        # Serverless runtimes may skip lifespan events; connect on first use instead
+        client = create_db_client()
+        state.db_client = client
+        state.db = client[get_db_name()] if client else None
+    return state.db
+
+# Sync status is polled by the dashboard; cache it briefly
+SYNC_STATUS_TTL = 2.0
+sync_status_cache = {"value": None, "ts": 0.0}
+
+def invalidate_sync_status():
+    sync_status_cache["value"] = None
+
+async def create_indexes(db):
+    await db.tasks.create_index("id", unique=True)
+    await db.tasks.create_index([("created_at", -1)])
+    # Only tasks linked to a Notion page carry a string notion_id
+    await db.tasks.create_index(
+        "notion_id",
+        unique=True,
+        partialFilterExpression={"notion_id": {"$type": "string"}}
+    )
+    await db.projects.create_index("id", unique=True)
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import uuid
+from datetime import datetime
+
+class Task(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    title: str
+    description: Optional[str] = ""
+    status: str = "Todo"  # Todo, In Progress, Done
+    priority: str = "Medium"  # Low, Medium, High
+    due_date: Optional[datetime] = None
+    notion_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class TaskCreate(BaseModel):
+    title: str
+    description: Optional[str] = ""
+    status: str = "Todo"
+    priority: str = "Medium"
+    due_date: Optional[datetime] = None
+
+class TaskUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    due_date: Optional[datetime] = None
+
+class Project(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    name: str
+    description: Optional[str] = ""
+    tasks: List[str] = []  # Task IDs
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ProjectCreate(BaseModel):
+    name: str
+    description: Optional[str] = ""
+
+class SyncStatus(BaseModel):
+    last_sync: Optional[datetime] = None
+    total_tasks: int = 0
+    synced_tasks: int = 0
+    status: str = "ready"
@@ -0,0 +1,363 @@
+from fastapi import Request
+from notion_client import AsyncClient
+from notion_client.errors import APIResponseError, APIErrorCode
+from pymongo import UpdateOne
+import httpx
+import os
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+import asyncio
+from asyncio import sleep
+import random
+
+from .database import invalidate_sync_status
+from .models import Task
+
+# Notion configuration
+notion_token = os.getenv('NOTION_TOKEN')
+notion_database_id = os.getenv('NOTION_DATABASE_ID')
+
+def create_notion_client():
+    """Create the Notion client, or None when NOTION_TOKEN isn't configured"""
+    if not notion_token:
+        return None
+    # Concurrent Notion requests share pooled HTTP/2 connections instead of new TLS handshakes
+    return AsyncClient(
+        auth=notion_token,
+        timeout_ms=10_000,  # notion-client overrides the httpx client's own timeout
+        client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+        )
+    )
+
+async def get_notion(request: Request) -> Optional[AsyncClient]:
+    """Dependency returning the Notion client opened by the app's lifespan"""
+    state = request.app.state
+    if not hasattr(state, "notion"):
+        # Serverless runtimes may skip lifespan events; create the client on first use instead
+        state.notion = create_notion_client()
+    return state.notion
+
+# Notion allows ~3 requests/sec per integration
+NOTION_CONCURRENCY = 3
+NOTION_MAX_RETRIES = 5
+
+# Edits to the same task within this window are pushed to Notion once
+NOTION_SYNC_DELAY = 1.0
+_pending_syncs: Dict[str, Task] = {}
+_sync_failures: Dict[str, int] = {}
+_syncing_ids = set()
+_pending_event = None
+_sync_worker = None
+_sync_batch = None
+_sync_db = None
+_sync_notion = None
+
+# Notion rounds last_edited_time down to the minute
+NOTION_EDIT_TIME_PRECISION = timedelta(minutes=1)
+
+# The last_sync watermark is per Notion database, so switching databases starts a full sweep
+NOTION_SYNC_STATE_ID = f"notion_sync:{notion_database_id}"
+
+async def _notion_call(fn, *args, **kwargs):
+    """Call a Notion endpoint, backing off and retrying when rate limited"""
+    for attempt in range(NOTION_MAX_RETRIES + 1):
+        try:
+            return await fn(*args, **kwargs)
+        except APIResponseError as e:
+            if e.code != APIErrorCode.RateLimited or attempt == NOTION_MAX_RETRIES:
+                raise
+            retry_after = e.headers.get("Retry-After")
+            if retry_after:
+                delay = float(retry_after)
+            else:
+                delay = 0.5 * 2 ** attempt * random.uniform(1, 1.5)
+            logging.warning(f"Notion rate limited, retrying in {delay:.1f}s")
+            await sleep(delay)
+
+async def sync_task_to_notion(task: Task, db, notion):
+    """Sync a task to Notion database"""
+    if not notion or not notion_database_id:
+        return None
+    
+    try:
+        properties = {
+            "Name": {"title": [{"text": {"content": task.title}}]},
+            "Status": {"select": {"name": task.status}},
+            "Priority": {"select": {"name": task.priority}},
+            "Description": {"rich_text": [{"text": {"content": task.description or ""}}]},
+        }
+        
+        if task.due_date:
+            properties["Due Date"] = {"date": {"start": task.due_date.isoformat()}}
+        
+        if task.notion_id:
+            # Update existing page
+            response = await _notion_call(
+                notion.pages.update,
+                page_id=task.notion_id,
+                properties=properties
+            )
+        else:
+            # Create new page
+            response = await _notion_call(
+                notion.pages.create,
+                parent={"database_id": notion_database_id},
+                properties=properties
+            )
+            # Update task with notion_id, unless another push linked it meanwhile
+            if db is not None:
+                result = await db.tasks.update_one(
+                    {"id": task.id, "notion_id": None},
+                    {"$set": {"notion_id": response["id"]}}
+                )
+                if result.matched_count == 0:
+                    logging.info(f"Task {task.id} was linked or deleted meanwhile, archiving duplicate page")
+                    await _notion_call(notion.pages.update, page_id=response["id"], archived=True)
+                    return None
+                invalidate_sync_status()
+        
+        return response["id"]
+    except Exception as e:
+        logging.error(f"Error syncing to Notion: {str(e)}")
+        return None
+
+async def _query_notion_database(notion, edited_since=None):
+    """Fetch pages of the Notion database, following pagination cursors"""
+    pages = []
+    query = {"database_id": notion_database_id, "page_size": 100}
+    if edited_since:
+        # Let Notion do the selection so only recently edited pages come back
+        query["filter"] = {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": edited_since.strftime("%Y-%m-%dT%H:%M:%SZ")}
+        }
+    while True:
+        response = await _notion_call(notion.databases.query, **query)
+        pages.extend(response["results"])
+        if not response.get("has_more"):
+            return pages
+        query["start_cursor"] = response["next_cursor"]
+
+def _parse_notion_date(value):
+    """Parse a Notion date, accepting the trailing Z that fromisoformat rejects before Python 3.11"""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        logging.warning(f"Ignoring unparseable Notion date: {value!r}")
+        return None
+
+def _is_unchanged(page, stored):
+    """Whether the stored import already reflects the page's latest edit"""
+    if not stored or stored.get("notion_last_edited") != page["last_edited_time"]:
+        return False
+    # Another edit within the same minute keeps the same last_edited_time,
+    # so only trust it once our read happened after that minute was over
+    edited_at = _parse_notion_date(page["last_edited_time"])
+    synced_at = stored.get("notion_synced_at")
+    if not edited_at or not synced_at:
+        return False
+    edited_at = edited_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return edited_at + NOTION_EDIT_TIME_PRECISION <= synced_at
+
+def _parse_notion_page(page):
+    """Parse a Notion page's properties into task fields"""
+    properties = page["properties"]
+
+    title = ""
+    if "Name" in properties and properties["Name"]["title"]:
+        title = properties["Name"]["title"][0]["text"]["content"]
+
+    status = "Todo"
+    if "Status" in properties and properties["Status"]["select"]:
+        status = properties["Status"]["select"]["name"]
+
+    priority = "Medium"
+    if "Priority" in properties and properties["Priority"]["select"]:
+        priority = properties["Priority"]["select"]["name"]
+
+    description = ""
+    if "Description" in properties and properties["Description"]["rich_text"]:
+        description = properties["Description"]["rich_text"][0]["text"]["content"]
+
+    due_date = None
+    if "Due Date" in properties and properties["Due Date"]["date"]:
+        due_date = _parse_notion_date(properties["Due Date"]["date"]["start"])
+
+    return {
+        "title": title,
+        "description": description,
+        "status": status,
+        "priority": priority,
+        "due_date": due_date
+    }
+
+async def sync_from_notion(db, notion):
+    """Sync tasks from Notion to local database"""
+    if not notion or not notion_database_id or db is None:
+        return 0
+    
+    try:
+        now = datetime.utcnow()
+        sync_state = await db.meta.find_one({"_id": NOTION_SYNC_STATE_ID})
+        edited_since = None
+        if sync_state and sync_state.get("last_sync"):
+            edited_since = sync_state["last_sync"] - NOTION_EDIT_TIME_PRECISION
+        
+        pages = await _query_notion_database(notion, edited_since)
+        
+        stored = {
+            doc["notion_id"]: doc
+            async for doc in db.tasks.find(
+                {"notion_id": {"$in": [page["id"] for page in pages]}},
+                {"_id": 0, "notion_id": 1, "notion_last_edited": 1, "notion_synced_at": 1}
+            )
+        } if pages else {}
+        
+        operations = []
+        for page in pages:
+            if _is_unchanged(page, stored.get(page["id"])):
+                continue
+            try:
+                fields = _parse_notion_page(page)
+            except (KeyError, IndexError, TypeError) as e:
+                # Skip a malformed page rather than abandoning the whole sync
+                logging.error(f"Error parsing Notion page {page.get('id')}: {str(e)}")
+                continue
+            operations.append(UpdateOne(
+                {"notion_id": page["id"]},
+                {
+                    "$set": {
+                        **fields,
+                        "notion_last_edited": page["last_edited_time"],
+                        "notion_synced_at": now,
+                        "updated_at": now
+                    },
+                    "$setOnInsert": {"id": uuid.uuid4().hex, "created_at": now}
+                },
+                upsert=True
+            ))
+        
+        if operations:
+            await db.tasks.bulk_write(operations, ordered=False)
+        
+        # Only advance the watermark once the whole sweep has been written
+        await db.meta.update_one(
+            {"_id": NOTION_SYNC_STATE_ID},
+            {"$set": {"last_sync": now}},
+            upsert=True
+        )
+        return len(operations)
+    except Exception as e:
+        logging.error(f"Error syncing from Notion: {str(e)}")
+        return 0
+
+def schedule_notion_sync(task: Task):
+    """Queue a task for the coalescing sync worker; returns False if it isn't running"""
+    if _sync_worker is None or _sync_worker.done():
+        return False
+    _pending_syncs[task.id] = task
+    _pending_event.set()
+    return True
+
+def pending_notion_sync_ids():
+    """Ids of the tasks the sync worker has queued or is pushing"""
+    return set(_pending_syncs) | _syncing_ids
+
+async def _sync_pending_tasks():
+    """Push every queued task to Notion, at most NOTION_CONCURRENCY at a time"""
+    batch = list(_pending_syncs.values())
+    _pending_syncs.clear()
+    _pending_event.clear()
+    
+    # A queued snapshot may predate the page created for it, or the task's deletion
+    unlinked = [task.id for task in batch if not task.notion_id]
+    if unlinked and _sync_db is not None:
+        stored = {
+            doc["id"]: doc.get("notion_id")
+            async for doc in _sync_db.tasks.find(
+                {"id": {"$in": unlinked}},
+                {"_id": 0, "id": 1, "notion_id": 1}
+            )
+        }
+        batch = [task for task in batch if task.notion_id or task.id in stored]
+        for task in batch:
+            if not task.notion_id:
+                task.notion_id = stored[task.id]
+    
+    semaphore = asyncio.Semaphore(NOTION_CONCURRENCY)
+    
+    async def sync_one(task: Task):
+        async with semaphore:
+            return await sync_task_to_notion(task, _sync_db, _sync_notion)
+    
+    batch_ids = {task.id for task in batch}
+    _syncing_ids.update(batch_ids)
+    try:
+        results = await asyncio.gather(*(sync_one(task) for task in batch), return_exceptions=True)
+    finally:
+        _syncing_ids.difference_update(batch_ids)
+    
+    # Retry failed pushes with the next batch, unless a newer edit of the task is already queued
+    for task, notion_id in zip(batch, results):
+        if notion_id and not isinstance(notion_id, BaseException):
+            _sync_failures.pop(task.id, None)
+            continue
+        failures = _sync_failures.get(task.id, 0) + 1
+        if failures > NOTION_MAX_RETRIES:
+            logging.error(f"Giving up pushing task {task.id} to Notion after {failures} attempts")
+            _sync_failures.pop(task.id, None)
+            continue
+        _sync_failures[task.id] = failures
+        _pending_syncs.setdefault(task.id, task)
+    if _pending_syncs:
+        _pending_event.set()
+
+async def _notion_sync_worker():
+    global _sync_batch
+    while True:
+        await _pending_event.wait()
+        await asyncio.sleep(NOTION_SYNC_DELAY)
+        # Shielded so shutdown waits for the pushes in flight instead of dropping them
+        _sync_batch = asyncio.create_task(_sync_pending_tasks())
+        try:
+            await asyncio.shield(_sync_batch)
+        except Exception as e:
+            logging.error(f"Error in Notion sync worker: {str(e)}")
+
+def start_notion_sync_worker(db, notion):
+    global _pending_event, _sync_worker, _sync_db, _sync_notion
+    if not notion or not notion_database_id:
+        return
+    _sync_db = db
+    _sync_notion = notion
+    _pending_event = asyncio.Event()
+    _sync_worker = asyncio.create_task(_notion_sync_worker())
+
+async def stop_notion_sync_worker():
+    global _sync_worker, _sync_batch
+    if _sync_worker is None:
+        return
+    _sync_worker.cancel()
+    try:
+        await _sync_worker
+    except asyncio.CancelledError:
+        pass
+    _sync_worker = None
+    # The in-flight batch has already left the queue; let it finish
+    if _sync_batch is not None:
+        try:
+            await _sync_batch
+        except Exception as e:
+            logging.error(f"Error in Notion sync worker: {str(e)}")
+        _sync_batch = None
+    # Flush edits that were still waiting out the coalescing delay, or whose push failed
+    if _pending_syncs:
+        await _sync_pending_tasks()
+    if _pending_syncs:
+        logging.error(f"Shutting down with {len(_pending_syncs)} tasks not pushed to Notion")
+    _pending_syncs.clear()
+    _sync_failures.clear()
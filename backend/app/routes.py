@@ -0,0 +1,300 @@
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from notion_client import AsyncClient
+from pymongo import ReturnDocument
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from datetime import datetime
+import asyncio
+import orjson
+import time
+
+from .database import (
+    SYNC_STATUS_TTL,
+    sync_status_cache,
+    invalidate_sync_status,
+    create_db_client,
+    get_db_name,
+    get_db,
+    create_indexes,
+)
+from .models import Task, TaskCreate, TaskUpdate, Project, ProjectCreate, SyncStatus
+from .notion import (
+    notion_database_id,
+    NOTION_CONCURRENCY,
+    NOTION_SYNC_STATE_ID,
+    sync_task_to_notion,
+    sync_from_notion,
+    create_notion_client,
+    get_notion,
+    schedule_notion_sync,
+    pending_notion_sync_ids,
+    start_notion_sync_worker,
+    stop_notion_sync_worker,
+)
+
+# Router with the /api prefix, shared by the backend server and the Vercel handler
+api_router = APIRouter(prefix="/api")
+
+# Streamed task lists bypass response_model, so project to the Task fields in Mongo
+TASK_PROJECTION = {"_id": 0, **{field: 1 for field in Task.model_fields}}
+
+@api_router.get("/")
+async def root():
+    return {"message": "Notion Task Manager API"}
+
+@api_router.get("/health")
+async def health_check(
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    notion: AsyncClient = Depends(get_notion)
+):
+    notion_status = "connected" if notion and notion_database_id else "not_configured"
+    db_status = "connected" if db is not None else "not_connected"
+    return {
+        "status": "healthy",
+        "notion_status": notion_status,
+        "db_status": db_status,
+        "timestamp": datetime.utcnow()
+    }
+
+# Task Routes
+@api_router.post("/tasks", response_model=Task)
+async def create_task(
+    task_create: TaskCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    notion: AsyncClient = Depends(get_notion)
+):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    task = Task.model_construct(**task_create.model_dump())
+    await db.tasks.insert_one(task.model_dump())
+    invalidate_sync_status()
+    
+    # Sync to Notion in background, coalescing rapid edits when the worker is running
+    if notion and notion_database_id and not schedule_notion_sync(task):
+        background_tasks.add_task(sync_task_to_notion, task, db, notion)
+    
+    return task
+
+@api_router.get("/tasks", response_model=List[Task])
+async def get_tasks(
+    limit: int = Query(1000, ge=1, le=1000),
+    skip: int = Query(0, ge=0),
+    status: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    if db is None:
+        return []
+    
+    query = {"status": status} if status else {}
+    cursor = db.tasks.find(query, TASK_PROJECTION).sort("created_at", -1).skip(skip).limit(limit)
+    # Run the query before the 200 goes out, so database errors still surface as a 500
+    try:
+        first_task = await cursor.next()
+    except StopAsyncIteration:
+        first_task = None
+    
+    async def stream_tasks():
+        # Encode each document as it arrives instead of buffering the whole list
+        yield b"["
+        if first_task is not None:
+            yield orjson.dumps(first_task)
+            async for task in cursor:
+                yield b"," + orjson.dumps(task)
+        yield b"]"
+    
+    return StreamingResponse(stream_tasks(), media_type="application/json")
+
+@api_router.get("/tasks/{task_id}", response_model=Task)
+async def get_task(task_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    task = await db.tasks.find_one({"id": task_id})
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return Task(**task)
+
+@api_router.put("/tasks/{task_id}", response_model=Task)
+async def update_task(
+    task_id: str,
+    task_update: TaskUpdate,
+    background_tasks: BackgroundTasks,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    notion: AsyncClient = Depends(get_notion)
+):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    update_data = task_update.model_dump(exclude_none=True)
+    update_data["updated_at"] = datetime.utcnow()
+    
+    updated_task = await db.tasks.find_one_and_update(
+        {"id": task_id},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if updated_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    invalidate_sync_status()
+    
+    task = Task(**updated_task)
+    
+    # Sync to Notion in background, coalescing rapid edits when the worker is running
+    if notion and notion_database_id and not schedule_notion_sync(task):
+        background_tasks.add_task(sync_task_to_notion, task, db, notion)
+    
+    return task
+
+@api_router.delete("/tasks/{task_id}")
+async def delete_task(task_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    result = await db.tasks.delete_one({"id": task_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Task not found")
+    invalidate_sync_status()
+    return {"message": "Task deleted successfully"}
+
+# Project Routes
+@api_router.post("/projects", response_model=Project)
+async def create_project(project_create: ProjectCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    project = Project.model_construct(**project_create.model_dump())
+    await db.projects.insert_one(project.model_dump())
+    return project
+
+@api_router.get("/projects", response_model=List[Project])
+async def get_projects(db: AsyncIOMotorDatabase = Depends(get_db)):
+    if db is None:
+        return []
+    
+    projects = await db.projects.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
+    return projects
+
+@api_router.get("/projects/{project_id}/tasks", response_model=List[Task])
+async def get_project_tasks(project_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    project = await db.projects.find_one({"id": project_id})
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    if project.get("tasks"):
+        tasks = await db.tasks.find({"id": {"$in": project["tasks"]}}, {"_id": 0}).to_list(1000)
+        return tasks
+    return []
+
+# Sync Routes
+@api_router.post("/sync")
+async def manual_sync(
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    notion: AsyncClient = Depends(get_notion)
+):
+    """Manually trigger bidirectional sync with Notion"""
+    if not notion or not notion_database_id:
+        raise HTTPException(status_code=400, detail="Notion not configured")
+    
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not connected")
+    
+    try:
+        # Sync FROM Notion
+        synced_count = await sync_from_notion(db, notion)
+        
+        # Sync TO Notion (existing local tasks without notion_id)
+        local_tasks = await db.tasks.find({"notion_id": None}).to_list(1000)
+        # The sync worker creates pages for the tasks it holds; pushing them here too would duplicate them
+        held = pending_notion_sync_ids()
+        local_tasks = [task_doc for task_doc in local_tasks if task_doc["id"] not in held]
+        semaphore = asyncio.Semaphore(NOTION_CONCURRENCY)
+        
+        async def sync_one(task: Task):
+            async with semaphore:
+                return await sync_task_to_notion(task, db, notion)
+        
+        results = await asyncio.gather(
+            *(sync_one(Task.model_construct(**task_doc)) for task_doc in local_tasks),
+            return_exceptions=True
+        )
+        synced_to_notion = sum(
+            1 for notion_id in results
+            if notion_id and not isinstance(notion_id, BaseException)
+        )
+        invalidate_sync_status()
+        
+        return {
+            "status": "success",
+            "synced_from_notion": synced_count,
+            "synced_to_notion": synced_to_notion,
+            "timestamp": datetime.utcnow()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
+
+@api_router.get("/sync/status", response_model=SyncStatus)
+async def get_sync_status(
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    notion: AsyncClient = Depends(get_notion)
+):
+    if db is None:
+        return SyncStatus(status="db_not_connected")
+    
+    cached = sync_status_cache["value"]
+    if cached and time.monotonic() - sync_status_cache["ts"] < SYNC_STATUS_TTL:
+        return cached
+    
+    total_tasks = await db.tasks.estimated_document_count()
+    synced_tasks = await db.tasks.count_documents({"notion_id": {"$type": "string"}})
+    
+    status = "ready"
+    if not notion or not notion_database_id:
+        status = "not_configured"
+    elif synced_tasks == 0 and total_tasks > 0:
+        status = "needs_sync"
+    elif synced_tasks == total_tasks:
+        status = "synced"
+    
+    sync_state = await db.meta.find_one({"_id": NOTION_SYNC_STATE_ID})
+    
+    sync_status = SyncStatus(
+        last_sync=sync_state.get("last_sync") if sync_state else None,
+        total_tasks=total_tasks,
+        synced_tasks=synced_tasks,
+        status=status
+    )
+    sync_status_cache["value"] = sync_status
+    sync_status_cache["ts"] = time.monotonic()
+    return sync_status
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the MongoDB and Notion clients and the Notion sync worker for the app's lifetime"""
+    client = create_db_client()
+    notion = create_notion_client()
+    app.state.db_client = client
+    app.state.db = client[get_db_name()] if client else None
+    app.state.notion = notion
+    try:
+        if client:
+            await client.admin.command("ping")
+            await create_indexes(app.state.db)
+        start_notion_sync_worker(app.state.db, notion)
+        yield
+    finally:
+        await stop_notion_sync_worker()
+        if client:
+            client.close()
+        if notion:
+            await notion.aclose()
+        # Closed clients must not be reused by a later lifespan or lazy dependency
+        del app.state.db_client, app.state.db, app.state.notion
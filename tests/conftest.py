@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The shared app package lives under backend/, as uvicorn and the Vercel handler expect
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
@@ -0,0 +1,309 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from notion_client.errors import APIResponseError, APIErrorCode
+
+from app import notion as notion_sync
+from app.models import Task
+
+
+class FakePages:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.archived = []
+
+    async def create(self, parent, properties):
+        self.created.append(properties)
+        return {"id": f"page-{len(self.created)}"}
+
+    async def update(self, page_id, properties=None, archived=False):
+        if archived:
+            self.archived.append(page_id)
+        else:
+            self.updated.append((page_id, properties))
+        return {"id": page_id}
+
+
+class FakeDatabases:
+    def __init__(self, *pages):
+        self.pages = list(pages)
+        self.queries = []
+
+    async def query(self, **query):
+        self.queries.append(query)
+        return {"results": self.pages, "has_more": False}
+
+
+class FakeNotion:
+    def __init__(self, *pages):
+        self.pages = FakePages()
+        self.databases = FakeDatabases(*pages)
+
+
+def rate_limited(retry_after=None):
+    headers = {"Retry-After": retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers)
+    return APIResponseError(response, "rate limited", APIErrorCode.RateLimited)
+
+
+def title_of(properties):
+    return properties["Name"]["title"][0]["text"]["content"]
+
+
+async def make_db(*tasks):
+    db = AsyncMongoMockClient()["notion_task_manager"]
+    for task in tasks:
+        await db.tasks.insert_one(task.model_dump())
+    return db
+
+
+@pytest.fixture(autouse=True)
+def sync_worker_config(monkeypatch):
+    monkeypatch.setattr(notion_sync, "notion_database_id", "database-id")
+    monkeypatch.setattr(notion_sync, "NOTION_SYNC_DELAY", 0.05)
+    yield
+    notion_sync._pending_syncs.clear()
+
+
+def test_notion_call_honours_retry_after(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(notion_sync, "sleep", fake_sleep)
+    responses = [rate_limited("2"), {"id": "page-1"}]
+
+    async def endpoint(**kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert asyncio.run(notion_sync._notion_call(endpoint, page_id="page-1")) == {"id": "page-1"}
+    assert delays == [2.0]
+
+
+def test_notion_call_gives_up_after_max_retries(monkeypatch):
+    calls = []
+
+    async def fake_sleep(delay):
+        pass
+
+    monkeypatch.setattr(notion_sync, "sleep", fake_sleep)
+
+    async def endpoint(**kwargs):
+        calls.append(kwargs)
+        raise rate_limited()
+
+    with pytest.raises(APIResponseError):
+        asyncio.run(notion_sync._notion_call(endpoint, page_id="page-1"))
+    assert len(calls) == notion_sync.NOTION_MAX_RETRIES + 1
+
+
+def test_notion_call_reraises_other_errors():
+    calls = []
+
+    async def endpoint(**kwargs):
+        calls.append(kwargs)
+        response = httpx.Response(404)
+        raise APIResponseError(response, "not found", APIErrorCode.ObjectNotFound)
+
+    with pytest.raises(APIResponseError):
+        asyncio.run(notion_sync._notion_call(endpoint, page_id="missing"))
+    assert len(calls) == 1
+
+
+def test_edits_within_delay_are_pushed_once():
+    task = Task(title="draft", notion_id="page-1")
+    notion = FakeNotion()
+
+    async def run():
+        notion_sync.start_notion_sync_worker(await make_db(task), notion)
+        for i in range(5):
+            assert notion_sync.schedule_notion_sync(task.model_copy(update={"title": f"edit {i}"}))
+        await asyncio.sleep(notion_sync.NOTION_SYNC_DELAY * 4)
+        await notion_sync.stop_notion_sync_worker()
+
+    asyncio.run(run())
+    assert [(page_id, title_of(p)) for page_id, p in notion.pages.updated] == [("page-1", "edit 4")]
+    assert notion.pages.created == []
+
+
+def test_edit_after_create_updates_the_created_page():
+    task = Task(title="new")
+    notion = FakeNotion()
+
+    async def run():
+        notion_sync.start_notion_sync_worker(await make_db(task), notion)
+        notion_sync.schedule_notion_sync(task)
+        await asyncio.sleep(notion_sync.NOTION_SYNC_DELAY * 4)
+        # The route's snapshot was taken before the page existed
+        notion_sync.schedule_notion_sync(task.model_copy(update={"title": "renamed"}))
+        await asyncio.sleep(notion_sync.NOTION_SYNC_DELAY * 4)
+        await notion_sync.stop_notion_sync_worker()
+
+    asyncio.run(run())
+    assert [title_of(p) for p in notion.pages.created] == ["new"]
+    assert [(page_id, title_of(p)) for page_id, p in notion.pages.updated] == [("page-1", "renamed")]
+
+
+def test_shutdown_flushes_queued_tasks(monkeypatch):
+    monkeypatch.setattr(notion_sync, "NOTION_SYNC_DELAY", 60)
+    task = Task(title="pending", notion_id="page-1")
+    notion = FakeNotion()
+
+    async def run():
+        notion_sync.start_notion_sync_worker(await make_db(task), notion)
+        notion_sync.schedule_notion_sync(task)
+        await notion_sync.stop_notion_sync_worker()
+
+    asyncio.run(run())
+    assert [title_of(p) for _, p in notion.pages.updated] == ["pending"]
+
+
+def test_shutdown_waits_for_the_batch_in_flight():
+    task = Task(title="new")
+    notion = FakeNotion()
+    pushing = asyncio.Event()
+    create = notion.pages.create
+
+    async def slow_create(**kwargs):
+        pushing.set()
+        await asyncio.sleep(0.1)
+        return await create(**kwargs)
+
+    notion.pages.create = slow_create
+
+    async def run():
+        db = await make_db(task)
+        notion_sync.start_notion_sync_worker(db, notion)
+        notion_sync.schedule_notion_sync(task)
+        await pushing.wait()
+        await notion_sync.stop_notion_sync_worker()
+        return await db.tasks.find_one({"id": task.id})
+
+    stored = asyncio.run(run())
+    assert [title_of(p) for p in notion.pages.created] == ["new"]
+    assert stored["notion_id"] == "page-1"
+
+
+def test_failed_push_is_retried():
+    task = Task(title="draft", notion_id="page-1")
+    notion = FakeNotion()
+    update = notion.pages.update
+    attempts = []
+
+    async def flaky_update(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection reset")
+        return await update(**kwargs)
+
+    notion.pages.update = flaky_update
+
+    async def run():
+        notion_sync.start_notion_sync_worker(await make_db(task), notion)
+        notion_sync.schedule_notion_sync(task)
+        await asyncio.sleep(notion_sync.NOTION_SYNC_DELAY * 6)
+        await notion_sync.stop_notion_sync_worker()
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+    assert [title_of(p) for _, p in notion.pages.updated] == ["draft"]
+
+
+def test_create_does_not_overwrite_a_concurrent_link():
+    task = Task(title="new")
+    notion = FakeNotion()
+
+    async def run():
+        db = await make_db(task.model_copy(update={"notion_id": "page-9"}))
+        notion_id = await notion_sync.sync_task_to_notion(task, db, notion)
+        return notion_id, await db.tasks.find_one({"id": task.id})
+
+    notion_id, stored = asyncio.run(run())
+    assert notion_id is None
+    assert stored["notion_id"] == "page-9"
+    assert notion.pages.archived == ["page-1"]
+
+
+def test_deleted_task_is_not_created():
+    task = Task(title="gone")
+    notion = FakeNotion()
+
+    async def run():
+        notion_sync.start_notion_sync_worker(await make_db(), notion)
+        notion_sync.schedule_notion_sync(task)
+        await asyncio.sleep(notion_sync.NOTION_SYNC_DELAY * 4)
+        await notion_sync.stop_notion_sync_worker()
+
+    asyncio.run(run())
+    assert notion.pages.created == []
+
+
+def notion_page(page_id, title, last_edited_time):
+    return {
+        "id": page_id,
+        "last_edited_time": last_edited_time,
+        "properties": {
+            "Name": {"title": [{"text": {"content": title}}]},
+            "Status": {"select": {"name": "Done"}},
+        },
+    }
+
+
+def test_is_unchanged_distrusts_reads_within_the_edit_minute():
+    page = {"id": "page-1", "last_edited_time": "2024-05-01T10:00:00.000Z"}
+    stored = {
+        "notion_last_edited": "2024-05-01T10:00:00.000Z",
+        "notion_synced_at": datetime(2024, 5, 1, 10, 0, 30),
+    }
+    # A second edit later in 10:00 keeps the same last_edited_time
+    assert notion_sync._is_unchanged(page, stored) is False
+
+    stored["notion_synced_at"] = datetime(2024, 5, 1, 10, 1)
+    assert notion_sync._is_unchanged(page, stored) is True
+
+
+def test_sync_from_notion_advances_the_watermark_with_lookback():
+    notion = FakeNotion(notion_page("page-1", "imported", "2024-05-01T10:00:00.000Z"))
+
+    async def run():
+        db = await make_db()
+        assert await notion_sync.sync_from_notion(db, notion) == 1
+        first = await db.meta.find_one({"_id": notion_sync.NOTION_SYNC_STATE_ID})
+        # The page comes back through the lookback, but is already imported
+        assert await notion_sync.sync_from_notion(db, notion) == 0
+        return db, first
+
+    db, first = asyncio.run(run())
+    full_sweep, incremental = notion.databases.queries
+    assert "filter" not in full_sweep
+    # Pages edited in the minute before the watermark may carry a rounded-down last_edited_time
+    edited_since = first["last_sync"] - notion_sync.NOTION_EDIT_TIME_PRECISION
+    assert incremental["filter"]["last_edited_time"] == {
+        "on_or_after": edited_since.strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
+    stored = asyncio.run(db.tasks.find_one({"notion_id": "page-1"}))
+    assert (stored["title"], stored["status"]) == ("imported", "Done")
+
+
+def test_failed_sync_from_notion_keeps_the_watermark():
+    notion = FakeNotion()
+
+    async def failing_query(**query):
+        raise httpx.ConnectError("connection reset")
+
+    notion.databases.query = failing_query
+
+    async def run():
+        db = await make_db()
+        assert await notion_sync.sync_from_notion(db, notion) == 0
+        return await db.meta.find_one({"_id": notion_sync.NOTION_SYNC_STATE_ID})
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app import notion as notion_sync
+from app import routes
+from app.database import get_db, invalidate_sync_status
+from app.models import Task
+from app.notion import get_notion
+from app.routes import api_router
+
+
+class FakeDatabases:
+    async def query(self, **query):
+        return {"results": [], "has_more": False}
+
+
+class FakePages:
+    def __init__(self):
+        self.created = []
+
+    async def create(self, parent, properties):
+        self.created.append(properties["Name"]["title"][0]["text"]["content"])
+        return {"id": f"page-{len(self.created)}"}
+
+
+class FakeNotion:
+    def __init__(self):
+        self.databases = FakeDatabases()
+        self.pages = FakePages()
+
+
+class UnreachableCursor:
+    def sort(self, *args):
+        return self
+
+    def skip(self, skip):
+        return self
+
+    def limit(self, limit):
+        return self
+
+    async def next(self):
+        raise ServerSelectionTimeoutError("no servers available")
+
+
+class UnreachableTasks:
+    def find(self, *args):
+        return UnreachableCursor()
+
+
+class UnreachableDB:
+    tasks = UnreachableTasks()
+
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient()["notion_task_manager"]
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(api_router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_notion] = lambda: None
+    invalidate_sync_status()
+    yield TestClient(app)
+    invalidate_sync_status()
+
+
+def test_task_writes_invalidate_cached_sync_status(client):
+    assert client.get("/api/sync/status").json()["total_tasks"] == 0
+
+    task = client.post("/api/tasks", json={"title": "first"}).json()
+    assert client.get("/api/sync/status").json()["total_tasks"] == 1
+
+    client.delete(f"/api/tasks/{task['id']}")
+    assert client.get("/api/sync/status").json()["total_tasks"] == 0
+
+
+def test_update_returns_the_updated_task(client):
+    task = client.post("/api/tasks", json={"title": "draft"}).json()
+
+    response = client.put(f"/api/tasks/{task['id']}", json={"status": "Done"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "Done"
+    assert response.json()["title"] == "draft"
+
+
+def test_update_of_missing_task_is_404(client):
+    response = client.put("/api/tasks/missing", json={"status": "Done"})
+    assert response.status_code == 404
+
+
+def test_manual_sync_skips_tasks_held_by_the_sync_worker(client, monkeypatch):
+    monkeypatch.setattr(notion_sync, "notion_database_id", "database-id")
+    monkeypatch.setattr(routes, "notion_database_id", "database-id")
+    queued = client.post("/api/tasks", json={"title": "queued"}).json()
+    client.post("/api/tasks", json={"title": "unlinked"})
+    monkeypatch.setitem(notion_sync._pending_syncs, queued["id"], Task(**queued))
+
+    notion = FakeNotion()
+    client.app.dependency_overrides[get_notion] = lambda: notion
+
+    response = client.post("/api/sync")
+    assert response.json()["synced_to_notion"] == 1
+    assert notion.pages.created == ["unlinked"]
+
+
+def test_list_tasks_streams_the_requested_page(client, db):
+    tasks = [
+        Task(title=f"task {day}", status="Done" if day % 2 else "Todo", created_at=datetime(2024, 5, day))
+        for day in range(1, 6)
+    ]
+    asyncio.run(db.tasks.insert_many([task.model_dump() for task in tasks]))
+
+    response = client.get("/api/tasks")
+    assert response.headers["content-type"] == "application/json"
+    assert [task["title"] for task in response.json()] == ["task 5", "task 4", "task 3", "task 2", "task 1"]
+    assert "_id" not in response.json()[0]
+
+    response = client.get("/api/tasks", params={"status": "Done", "skip": 1, "limit": 1})
+    assert [task["title"] for task in response.json()] == ["task 3"]
+
+    assert client.get("/api/tasks", params={"status": "Blocked"}).json() == []
+    assert client.get("/api/tasks", params={"limit": 0}).status_code == 422
+
+
+def test_list_tasks_reports_database_errors(client):
+    client.app.dependency_overrides[get_db] = lambda: UnreachableDB()
+    client = TestClient(client.app, raise_server_exceptions=False)
+
+    assert client.get("/api/tasks").status_code == 500